@@ -0,0 +1,74 @@
+import hashlib
+import os
+from typing import Optional, Tuple
+import orjson
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Caching is optional: without REDIS_URL every lookup is a miss
+REDIS_URL = os.environ.get("REDIS_URL")
+TASK_LIST_CACHE_TTL = int(os.environ.get("TASK_LIST_CACHE_TTL", "30"))
+
+# Bumped on every write; it is part of each task list key, so one INCR
+# invalidates every cached page at once
+GENERATION_KEY = "tasks:gen"
+
+if REDIS_URL:
+    import redis
+    redis_client = redis.Redis.from_url(REDIS_URL)
+    # A failing cache should never fail the request
+    CACHE_ERRORS = (redis.RedisError,)
+else:
+    redis_client = None
+    CACHE_ERRORS = ()
+
+
+def task_list_key(generation: int, params: Tuple) -> str:
+    """Build the cache key of a task list page from its query parameters"""
+    # orjson encodes datetimes and enums natively
+    payload = orjson.dumps(params)
+    return f"tasks:{generation}:{hashlib.blake2b(payload).hexdigest()}"
+
+
+def current_task_list_key(params: Tuple) -> Optional[str]:
+    """Cache key of a task list page for the current data generation, or None when caching is off"""
+    if redis_client is None:
+        return None
+    try:
+        # Read once per request: the page is stored under the generation it was
+        # looked up at, so a write committing in between can't leave it current
+        return task_list_key(int(redis_client.get(GENERATION_KEY) or 0), params)
+    except CACHE_ERRORS:
+        return None
+
+
+def get_task_list(key: Optional[str]) -> Optional[bytes]:
+    """Get a cached task list response body, or None on a miss"""
+    if key is None:
+        return None
+    try:
+        return redis_client.get(key)
+    except CACHE_ERRORS:
+        return None
+
+
+def set_task_list(key: Optional[str], body: bytes) -> None:
+    """Cache a task list response body under the key it was looked up with"""
+    if key is None:
+        return
+    try:
+        redis_client.set(key, body, ex=TASK_LIST_CACHE_TTL)
+    except CACHE_ERRORS:
+        pass
+
+
+def invalidate_tasks() -> None:
+    """Invalidate every cached task list after tasks change"""
+    if redis_client is None:
+        return
+    try:
+        redis_client.incr(GENERATION_KEY)
+    except CACHE_ERRORS:
+        pass
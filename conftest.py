@@ -5,7 +5,11 @@ Pytest configuration and fixtures for the Task Management API tests.
 import os
 import pytest
 import tempfile
+from datetime import datetime, timedelta
+from types import MappingProxyType
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlmodel import SQLModel, create_engine, Session
 from sqlmodel.pool import StaticPool
 
@@ -16,12 +20,18 @@ os.environ["DEBUG"] = "false"
 
 from main import app
 from database import get_session
-from models import Task
+from models import Task, TaskCreate, TaskResponse, TaskStatus, TaskPriority
+from crud import bulk_create_tasks
+from tests.helpers import expect
 
 
-@pytest.fixture(scope="function")
+# Due dates must be in the future when a task is created
+_FUTURE_DUE_DATE = (datetime.now() + timedelta(days=365)).replace(microsecond=0).isoformat()
+
+
+@pytest.fixture(scope="session")
 def test_engine():
-    """Create a test database engine with in-memory SQLite."""
+    """Create one in-memory SQLite engine and schema for the whole test run."""
     engine = create_engine(
         "sqlite:///:memory:",
         connect_args={
@@ -29,40 +39,66 @@ def test_engine():
         },
         poolclass=StaticPool,
     )
+    
+    # pysqlite doesn't emit BEGIN itself, which breaks SAVEPOINT; let
+    # SQLAlchemy start transactions instead
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(connection):
+        connection.exec_driver_sql("BEGIN")
+    
     SQLModel.metadata.create_all(engine)
     yield engine
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
 def test_session(test_engine):
-    """Create a test database session."""
-    with Session(test_engine) as session:
-        yield session
+    """Create a test database session rolled back after each test."""
+    with test_engine.connect() as connection:
+        transaction = connection.begin()
+        # Commits and rollbacks in the code under test only touch a SAVEPOINT
+        with Session(bind=connection, join_transaction_mode="create_savepoint") as session:
+            yield session
+        transaction.rollback()
+
+
+@pytest.fixture(scope="session")
+def started_app():
+    """Run the application's startup and shutdown once for the whole test run."""
+    # TestClient keeps the lifespan open in its own thread until the run ends
+    with TestClient(app):
+        yield app
 
 
 @pytest.fixture(scope="function")
-def client(test_session):
-    """Create a test client with dependency overrides."""
+async def client(started_app, test_session):
+    """Create an async test client with dependency overrides."""
     def get_test_session():
         return test_session
 
-    app.dependency_overrides[get_session] = get_test_session
+    started_app.dependency_overrides[get_session] = get_test_session
     
-    with TestClient(app) as test_client:
+    # Requests go straight to the ASGI app, without TestClient's thread and portal
+    transport = ASGITransport(app=started_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
         yield test_client
     
     # Clean up
-    app.dependency_overrides.clear()
+    started_app.dependency_overrides.clear()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_task_data():
-    """Sample task data for testing."""
-    return {
+    """Sample task data for testing, shared read-only across the session."""
+    return MappingProxyType({
         "title": "Test Task",
         "description": "This is a test task description",
         "status": "pending"
-    }
+    })
 
 
 @pytest.fixture
@@ -72,7 +108,7 @@ def sample_task_with_due_date():
         "title": "Task with Due Date",
         "description": "This task has a due date",
         "status": "pending",
-        "due_date": "2025-12-31T23:59:59"  # Future date
+        "due_date": _FUTURE_DUE_DATE
     }
 
 
@@ -94,25 +130,31 @@ def multiple_tasks_data():
             "title": "Third Task",
             "description": "Third test task",
             "status": "pending",
-            "due_date": "2025-12-31T23:59:59"  # Future date
+            "due_date": _FUTURE_DUE_DATE
         }
     ]
 
 
 @pytest.fixture
-def created_task(client, sample_task_data):
+def seeded_tasks(test_session):
+    """Insert tasks for the filter and search tests directly, without the API."""
+    return bulk_create_tasks(test_session, [
+        TaskCreate(title="Python Programming", status=TaskStatus.completed, priority=TaskPriority.high),
+        TaskCreate(title="Java Development", status=TaskStatus.pending, priority=TaskPriority.low),
+    ])
+
+
+@pytest.fixture
+async def created_task(client, sample_task_data):
     """Create a task and return its data."""
-    response = client.post("/tasks", json=sample_task_data)
-    assert response.status_code == 201
-    return response.json()
+    response = await client.post("/tasks", json=dict(sample_task_data))
+    return expect(response, 201)
 
 
 @pytest.fixture
-def created_multiple_tasks(client, multiple_tasks_data):
-    """Create multiple tasks and return their data."""
-    created_tasks = []
-    for task_data in multiple_tasks_data:
-        response = client.post("/tasks", json=task_data)
-        assert response.status_code == 201
-        created_tasks.append(response.json())
-    return created_tasks
+def created_multiple_tasks(test_session, multiple_tasks_data):
+    """Create multiple tasks and return their data as the API would."""
+    tasks = bulk_create_tasks(
+        test_session, [TaskCreate(**task_data) for task_data in multiple_tasks_data]
+    )
+    return [TaskResponse.model_validate(task).model_dump(mode="json") for task in tasks]
@@ -1,21 +1,84 @@
 from datetime import datetime
-from typing import List, Optional, Tuple
-from sqlmodel import Session, delete, select, update
-from models import Task, TaskCreate, TaskUpdate, TaskStatus, TaskPriority, create_task_filter
+from typing import Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import raiseload
+from sqlmodel import Session, delete, func, insert, select, update
+from models import (
+    Task, TaskCreate, TaskUpdate, TaskStatus, TaskPriority, build_task_queries
+)
+
+# Rows fetched from the cursor at a time when streaming a result set
+_STREAM_BATCH = 500
+
+# Largest IN (...) list sent in one statement; keeps bulk operations under
+# SQLite's bound-parameter limit and the statements cheap to parse
+_BULK_CHUNK = 500
+
+
+class TasksNotFoundError(ValueError):
+    """Raised when a bulk operation names tasks that don't exist"""
+
+
+def _chunks(seq: Sequence[int], size: int) -> Iterator[Sequence[int]]:
+    """Split a sequence into consecutive slices of at most `size` items"""
+    for start in range(0, len(seq), size):
+        yield seq[start:start + size]
+
+
+def _stream(session: Session, statement, params: Optional[dict] = None) -> Iterator[Task]:
+    """Yield the tasks a statement returns, fetching them from the database in batches"""
+    result = session.exec(statement.execution_options(yield_per=_STREAM_BATCH), params=params)
+    yield from result
+
+
+def _detach(session: Session, tasks: List[Task]) -> None:
+    """Detach already-loaded tasks so the next commit doesn't expire and reload them"""
+    for task in tasks:
+        session.expunge(task)
 
 
 def create_task(session: Session, task: TaskCreate) -> Task:
     """Create a new task"""
-    db_task = Task.model_validate(task)
-    session.add(db_task)
+    if not session.get_bind().dialect.insert_returning:
+        # TaskCreate is already validated; table models don't re-run validators
+        db_task = Task(**task.model_dump())
+        session.add(db_task)
+        session.commit()
+        session.refresh(db_task)
+        return db_task
+    
+    # INSERT ... RETURNING hands back id and defaults without a follow-up SELECT
+    stmt = insert(Task).values(**task.model_dump(), created_at=datetime.now()).returning(Task)
+    db_task = session.exec(stmt).scalars().one()
+    _detach(session, [db_task])
     session.commit()
-    session.refresh(db_task)
     return db_task
 
 
+def bulk_create_tasks(session: Session, tasks: List[TaskCreate]) -> List[Task]:
+    """Bulk create multiple tasks"""
+    if not tasks:
+        return []
+    
+    created_at = datetime.now()
+    rows = [{**task.model_dump(), 'created_at': created_at} for task in tasks]
+    
+    if session.get_bind().dialect.insert_executemany_returning:
+        # One batched INSERT ... RETURNING instead of a round-trip per task
+        stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+        created_tasks = session.exec(stmt, params=rows).scalars().all()
+    else:
+        created_tasks = [Task(**row) for row in rows]
+        session.add_all(created_tasks)
+        session.flush()
+    
+    _detach(session, created_tasks)
+    session.commit()
+    return created_tasks
+
+
 def get_task(session: Session, task_id: int) -> Optional[Task]:
     """Get a task by ID"""
-    return session.get(Task, task_id)
+    return session.get(Task, task_id, options=[raiseload("*")])
 
 
 def get_tasks(
@@ -33,40 +96,51 @@ def get_tasks(
     has_due_date: Optional[bool] = None,
     is_overdue: Optional[bool] = None,
     sort_by: Optional[str] = "created_at",
-    sort_order: Optional[str] = "desc"
-) -> Tuple[List[Task], int]:
+    sort_order: Optional[str] = "desc",
+    after: Optional[Tuple[datetime, int]] = None,
+    with_total: bool = True
+) -> Tuple[List[Task], Optional[int]]:
     """
-    Get tasks with advanced filtering using Builder pattern.
-    Returns tuple of (tasks, total_count).
+    Get tasks with advanced filtering.
+    Pass the (created_at, id) of the last task seen as `after` to page by
+    keyset instead of offset; deep pages then cost the same as the first.
+    Pass with_total=False when the total isn't needed to skip counting it.
+    Returns tuple of (tasks, total_count); total_count is None without with_total.
     """
-    filter_builder = (create_task_filter()
-                     .session(session)
-                     .by_status(status)
-                     .by_priority(priority)
-                     .by_assigned_to(assigned_to)
-                     .created_between(created_after, created_before)
-                     .due_between(due_after, due_before)
-                     .search_text(search)
-                     .has_due_date(has_due_date)
-                     .is_overdue(is_overdue)
-                     .order_by(sort_by, sort_order)
-                     .with_pagination(skip, limit))
+    query, count_query, params = build_task_queries(
+        status=status,
+        priority=priority,
+        assigned_to=assigned_to,
+        created_after=created_after,
+        created_before=created_before,
+        due_after=due_after,
+        due_before=due_before,
+        search=search,
+        has_due_date=has_due_date,
+        is_overdue=is_overdue,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        skip=skip,
+        limit=limit,
+        after=after,
+        # The cursor condition would narrow a window count, so keyset pages
+        # still count separately
+        with_total=with_total and after is None
+    )
     
-    return filter_builder.execute()
-
-
-def get_tasks_by_status(session: Session, status: TaskStatus) -> List[Task]:
-    """Get tasks by status"""
-    statement = select(Task).where(Task.status == status)
-    result = session.exec(statement)
-    return result.all()
-
-
-def get_tasks_by_priority(session: Session, priority: TaskPriority) -> List[Task]:
-    """Get tasks by priority"""
-    statement = select(Task).where(Task.priority == priority)
-    result = session.exec(statement)
-    return result.all()
+    if not with_total:
+        return session.exec(query, params=params).all(), None
+    
+    if after is not None:
+        total = session.exec(count_query, params=params).one()
+        return session.exec(query, params=params).all(), total
+    
+    # The total rides along on every row as COUNT(*) OVER (), so a page costs
+    # one round-trip; only an empty page needs the separate count
+    rows = session.exec(query, params=params).all()
+    if rows:
+        return [task for task, _ in rows], rows[0].total
+    return [], session.exec(count_query, params=params).one()
 
 
 def update_task(session: Session, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
@@ -75,15 +149,14 @@ def update_task(session: Session, task_id: int, task_update: TaskUpdate) -> Opti
     if not db_task:
         return None
     
-    task_data = task_update.model_dump(exclude_unset=True)
-    if task_data:
-        task_data['updated_at'] = datetime.now()
-        for key, value in task_data.items():
-            setattr(db_task, key, value)
+    fields_set = task_update.model_fields_set
+    if fields_set:
+        for key in fields_set:
+            setattr(db_task, key, getattr(task_update, key))
+        db_task.updated_at = datetime.now()
         
         session.add(db_task)
         session.commit()
-        session.refresh(db_task)
     
     return db_task
 
@@ -101,9 +174,8 @@ def delete_task(session: Session, task_id: int) -> bool:
 
 def get_tasks_count(session: Session) -> int:
     """Get total count of tasks"""
-    statement = select(Task)
-    result = session.exec(statement)
-    return len(result.all())
+    statement = select(func.count(Task.id))
+    return session.exec(statement).one()
 
 
 def bulk_update_tasks(
@@ -112,60 +184,83 @@ def bulk_update_tasks(
     task_update: TaskUpdate
 ) -> List[Task]:
     """Bulk update multiple tasks"""
+    ids = list(dict.fromkeys(task_ids))
     updated_tasks = []
-    task_data = task_update.model_dump(exclude_unset=True)
+    task_data = {key: getattr(task_update, key) for key in task_update.model_fields_set}
     
     if task_data:
         task_data['updated_at'] = datetime.now()
         
-        existing_tasks = session.exec(select(Task).where(Task.id.in_(task_ids))).all()
-
-        if len(existing_tasks) != len(task_ids):
-            existing_ids = [task.id for task in existing_tasks]
-            missing_ids = list(set(task_ids) - set(existing_ids))
-            raise ValueError(f"Tasks not found: {missing_ids}")
-
-        stmt = (
+        supports_returning = session.get_bind().dialect.update_returning
+        
+        # All batches run inside the same transaction and are committed once
+        for batch in _chunks(ids, _BULK_CHUNK):
+            stmt = (
                 update(Task)
-                .where(Task.id.in_(task_ids))
+                .where(Task.id.in_(batch))
                 .values(**task_data)
             )
-        session.exec(stmt)
-        session.commit()
+            
+            if supports_returning:
+                # UPDATE ... RETURNING hands back the updated rows in the same round-trip
+                updated_tasks.extend(session.exec(stmt.returning(Task)).scalars().all())
+            else:
+                session.exec(stmt)
+                updated_tasks.extend(session.exec(select(Task).where(Task.id.in_(batch))).all())
         
-        updated_tasks = session.exec(
-        select(Task).where(Task.id.in_(task_ids))
-    ).all()
+        if len(updated_tasks) != len(ids):
+            session.rollback()
+            existing_ids = {task.id for task in updated_tasks}
+            missing_ids = [task_id for task_id in ids if task_id not in existing_ids]
+            raise TasksNotFoundError(f"Tasks not found: {missing_ids}")
         
+        _detach(session, updated_tasks)
+        session.commit()
     
     return updated_tasks
 
 
 def bulk_delete_tasks(session: Session, task_ids: List[int]) -> int:
-    existing_tasks = session.exec(select(Task).where(Task.id.in_(task_ids))).all()
-
-    if len(existing_tasks) != len(task_ids):
-        existing_ids = [task.id for task in existing_tasks]
-        missing_ids = list(set(task_ids) - set(existing_ids))
-        raise ValueError(f"Tasks not found: {missing_ids}")
+    """Bulk delete multiple tasks"""
+    ids = list(dict.fromkeys(task_ids))
     
-    stmt = (
-        delete(Task)
-        .where(Task.id.in_(task_ids))
-    )
+    if session.get_bind().dialect.delete_returning:
+        # DELETE ... RETURNING reports which IDs existed without a separate lookup
+        deleted_ids = set()
+        for batch in _chunks(ids, _BULK_CHUNK):
+            stmt = delete(Task).where(Task.id.in_(batch)).returning(Task.id)
+            deleted_ids.update(session.exec(stmt).scalars().all())
+        
+        if len(deleted_ids) != len(ids):
+            session.rollback()
+            missing_ids = [task_id for task_id in ids if task_id not in deleted_ids]
+            raise TasksNotFoundError(f"Tasks not found: {missing_ids}")
+        
+        session.commit()
+        return len(deleted_ids)
+    
+    affected_count = 0
+    for batch in _chunks(ids, _BULK_CHUNK):
+        stmt = (
+            delete(Task)
+            .where(Task.id.in_(batch))
+        )
+        affected_count += session.exec(stmt).rowcount
+
+    if affected_count != len(ids):
+        # Undo the partial delete, then look up which IDs are actually missing
+        session.rollback()
+        existing_ids = set()
+        for batch in _chunks(ids, _BULK_CHUNK):
+            existing_ids.update(session.exec(select(Task.id).where(Task.id.in_(batch))).all())
+        missing_ids = [task_id for task_id in ids if task_id not in existing_ids]
+        raise TasksNotFoundError(f"Tasks not found: {missing_ids}")
     
-    result = session.exec(stmt)
-    affected_count = result.rowcount
     session.commit()
     return affected_count
 
 
-def search_tasks(session: Session, search_term: str) -> List[Task]:
-    """Search tasks by title or description"""
-    search_pattern = f"%{search_term}%"
-    statement = select(Task).where(
-        (Task.title.ilike(search_pattern)) | 
-        (Task.description.ilike(search_pattern))
-    )
-    result = session.exec(statement)
-    return result.all()
+def search_tasks(session: Session, search_term: str) -> Iterator[Task]:
+    """Stream tasks matching a search term in title or description"""
+    query, _, params = build_task_queries(search=search_term)
+    return _stream(session, query, params)
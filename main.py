@@ -1,5 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 from contextlib import asynccontextmanager
+import orjson
 import uvicorn
 import os
 from dotenv import load_dotenv
@@ -7,7 +10,8 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-from database import create_db_and_tables
+from database import create_db_and_tables, dispose_engine
+from crud import TasksNotFoundError
 from routers import tasks
 
 # Environment variables from .env file (no defaults - .env is source of truth)
@@ -21,27 +25,8 @@ ENVIRONMENT = os.environ["ENVIRONMENT"]
 DATABASE_URL = os.environ["DATABASE_URL"]
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Create database tables on startup"""
-    create_db_and_tables()
-    yield
-
-
-app = FastAPI(
-    title=API_TITLE,
-    description=API_DESCRIPTION,
-    version=API_VERSION,
-    lifespan=lifespan
-)
-
-# Include the tasks router
-app.include_router(tasks.router)
-
-
-@app.get("/")
-async def root():
-    """Root endpoint - Return API information and available endpoints"""
+def _build_endpoints_doc(app: FastAPI) -> dict:
+    """Build the API information and available endpoints returned by the root endpoint"""
     
     # Core endpoints (non-router endpoints)
     core_endpoints = {
@@ -93,6 +78,73 @@ async def root():
     }
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create database tables and build the endpoint listing on startup"""
+    create_db_and_tables()
+    # Routes are fixed once the app starts, so the root listing is built only once
+    app.state.endpoints_doc = _build_endpoints_doc(app)
+    yield
+    # Release pooled connections on shutdown
+    dispose_engine()
+
+
+app = FastAPI(
+    title=API_TITLE,
+    description=API_DESCRIPTION,
+    version=API_VERSION,
+    lifespan=lifespan,
+    # orjson encodes responses (including datetimes and enums) natively in C
+    default_response_class=ORJSONResponse
+)
+
+# Include the tasks router
+app.include_router(tasks.router)
+
+# Replace FastAPI's schema route, which re-encodes the schema on every request
+app.router.routes = [
+    route for route in app.router.routes if getattr(route, "path", None) != app.openapi_url
+]
+
+
+@app.get(app.openapi_url, include_in_schema=False)
+async def openapi_schema(request: Request):
+    """OpenAPI schema, encoded on the first request and reused"""
+    # Same root_path handling as FastAPI's own route: behind a proxy the prefix
+    # is listed as a server, so "Try it out" in /docs calls the right URL
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    server_urls = {server.get("url") for server in app.servers}
+    if root_path and app.root_path_in_servers and root_path not in server_urls:
+        app.servers.insert(0, {"url": root_path})
+        # Rebuild the schema so it picks up the new server
+        app.openapi_schema = None
+        app.state.openapi_bytes = None
+    if getattr(app.state, "openapi_bytes", None) is None:
+        app.state.openapi_bytes = orjson.dumps(app.openapi())
+    return Response(content=app.state.openapi_bytes, media_type="application/json")
+
+
+# Errors raised by CRUD operations are translated to HTTP responses here,
+# so the endpoints themselves carry no try/except
+@app.exception_handler(TasksNotFoundError)
+@app.exception_handler(tasks.InvalidCursorError)
+async def invalid_request_handler(request: Request, exc: ValueError):
+    """Report invalid input (missing tasks in a bulk operation, a bad cursor) as 422"""
+    return ORJSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content={"detail": str(exc)})
+
+
+@app.exception_handler(SQLAlchemyError)
+async def database_error_handler(request: Request, exc: SQLAlchemyError):
+    """Report a failed database operation as 400"""
+    return ORJSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": f"Database error: {exc}"})
+
+
+@app.get("/")
+async def root():
+    """Root endpoint - Return API information and available endpoints"""
+    return app.state.endpoints_doc
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
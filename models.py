@@ -1,8 +1,14 @@
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional, List
+from functools import lru_cache
+from typing import Literal, Optional, List, NamedTuple, Tuple, get_args
+from sqlalchemy import Index, Integer, bindparam, event, text, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import raiseload
+from sqlalchemy.sql.functions import FunctionElement
 from sqlmodel import SQLModel, Field, select, and_, or_, func
-from pydantic import field_validator
+from pydantic import ConfigDict, field_validator
+from sqlmodel.sql.expression import Select
 
 
 class TaskStatus(str, Enum):
@@ -49,11 +55,152 @@ class TaskBase(SQLModel):
 
 
 class Task(TaskBase, table=True):
+    # Composite indexes match the list filters followed by the default
+    # created_at ordering, so filtered pages come from an index range scan
+    __table_args__ = (
+        Index("ix_task_status_created_at", "status", "created_at"),
+        Index("ix_task_priority_created_at", "priority", "created_at"),
+        Index("ix_task_assigned_to", "assigned_to"),
+        Index("ix_task_due_date", "due_date"),
+        Index("ix_task_created_at", "created_at"),
+        # Partial index for the overdue filter (Postgres only)
+        Index(
+            "ix_task_overdue",
+            "due_date",
+            postgresql_where=text("status <> 'completed'")
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_task_status_priority", "status", "priority"),
+        # Trigram index answering the ILIKE '%term%' search (Postgres only,
+        # needs the pg_trgm extension created below)
+        Index(
+            "ix_task_search_trgm",
+            "title",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops", "description": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+    
+    # Rows come from validated TaskCreate/TaskUpdate input or from the database,
+    # so attribute sets (including ORM loads and refreshes) skip the validators
+    model_config = ConfigDict(validate_assignment=False)
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
 
 
+@event.listens_for(SQLModel.metadata, "before_create")
+def create_trigram_extension(target, connection, **kw):
+    """Enable pg_trgm on Postgres so the trigram search index can be created."""
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+# Full-text search index (SQLite only). The trigram tokenizer matches any
+# substring of at least 3 characters, case-insensitively, so it answers the
+# same questions as ILIKE '%term%' without scanning the whole table.
+TASK_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        title, description, content='task', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF title, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+)
+
+# Shortest search term the trigram index can answer
+FTS_MIN_TERM_LENGTH = 3
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def create_task_search_index(target, connection, **kw):
+    """Create the task full-text index and its sync triggers on SQLite."""
+    if connection.dialect.name != "sqlite":
+        return
+    
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'"
+    ).first()
+    for ddl in TASK_FTS_DDL:
+        connection.exec_driver_sql(ddl)
+    if not exists:
+        # Index tasks that were stored before the index existed
+        connection.exec_driver_sql("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+
+
+@event.listens_for(SQLModel.metadata, "before_drop")
+def drop_task_search_index(target, connection, **kw):
+    """Drop the task full-text index, which isn't part of the metadata, with the tables."""
+    if connection.dialect.name == "sqlite":
+        # Left behind, its entries would match new tasks that reuse old ids
+        connection.exec_driver_sql("DROP TABLE IF EXISTS task_fts")
+
+
+class _TaskTextMatch(FunctionElement):
+    """Task text search: FTS5 lookup on SQLite, ILIKE fallback elsewhere."""
+    inherit_cache = True
+    name = "task_text_match"
+
+
+@compiles(_TaskTextMatch)
+def _compile_task_text_match(element, compiler, **kw):
+    _, like_condition = element.clauses.clauses
+    # Parenthesized so the OR doesn't escape the surrounding AND of other filters
+    return compiler.process(like_condition.self_group(), **kw)
+
+
+@compiles(_TaskTextMatch, "sqlite")
+def _compile_task_text_match_sqlite(element, compiler, **kw):
+    fts_query, _ = element.clauses.clauses
+    return "%s IN (SELECT rowid FROM task_fts WHERE task_fts MATCH %s)" % (
+        compiler.process(Task.__table__.c.id, **kw),
+        compiler.process(fts_query, **kw),
+    )
+
+
+def _task_text_condition(use_fts: bool):
+    """Text search condition on the `search` (and `search_fts`) parameters."""
+    like_condition = or_(
+        Task.title.ilike(bindparam("search")),
+        Task.description.ilike(bindparam("search"))
+    )
+    if not use_fts:
+        return like_condition
+    return _TaskTextMatch(bindparam("search_fts"), like_condition)
+
+
+def _task_text_params(search_term: str) -> Tuple[bool, dict]:
+    """Whether the full-text index can answer a search term, and its parameters."""
+    params = {"search": f"%{search_term}%"}
+    if len(search_term) < FTS_MIN_TERM_LENGTH:
+        return False, params
+    
+    # Quoted as a single FTS5 string so the term is matched literally
+    params["search_fts"] = '"' + search_term.replace('"', '""') + '"'
+    return True, params
+
+
+# Columns the task list can be sorted by, resolved once at import
+SortField = Literal[
+    "id", "title", "status", "priority", "due_date", "assigned_to", "created_at", "updated_at"
+]
+SortOrder = Literal["asc", "desc"]
+
+_SORTABLE = {name: Task.__table__.c[name] for name in get_args(SortField)}
+
+
 # Request/Response models
 class TaskCreate(TaskBase):
     pass
@@ -87,12 +234,26 @@ class TaskUpdate(SQLModel):
 
 
 class TaskResponse(TaskBase):
+    # Built straight from Task rows when serializing responses
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+    @field_validator('due_date')
+    @classmethod
+    def validate_due_date(cls, v):
+        # Stored tasks are trusted and may be past their due date by now;
+        # only new input has to be in the future
+        return v
+
 
 # Bulk operation models
+class BulkCreateRequest(SQLModel):
+    tasks: List[TaskCreate]
+
+
 class BulkUpdateRequest(SQLModel):
     task_ids: List[int]
     update_data: TaskUpdate
@@ -119,16 +280,204 @@ class TaskListResponse(SQLModel):
     has_next: bool
     has_previous: bool
     filters_applied: dict = {}
+    next_cursor: Optional[str] = None
+
+
+# Advanced filtering
+class TaskQueries(NamedTuple):
+    """A task list query, its count query and the values bound to both."""
+    query: Select
+    count_query: Select
+    params: dict
+
 
+# Filters compared against a bound value of the same name
+_VALUE_FILTERS = (
+    "status", "priority", "assigned_to", "created_after", "created_before",
+    "due_after", "due_before"
+)
 
-# Advanced filtering using Builder design pattern
+
+@lru_cache(maxsize=64)
+def _task_query_template(
+    value_filters: frozenset,
+    search: Optional[str],
+    has_due_date: Optional[bool],
+    is_overdue: Optional[bool],
+    sort_by: Optional[str],
+    descending: bool,
+    paginated: bool,
+    keyset: bool,
+    with_total: bool
+) -> Tuple[Select, Select]:
+    """
+    Build the task list statements for one combination of filters.
+    
+    Only which filters are used shapes the SQL; their values are left as bound
+    parameters, so each combination is built once and then reused.
+    """
+    conditions = []
+    
+    if "status" in value_filters:
+        conditions.append(Task.status == bindparam("status"))
+    if "priority" in value_filters:
+        conditions.append(Task.priority == bindparam("priority"))
+    if "assigned_to" in value_filters:
+        conditions.append(Task.assigned_to.ilike(bindparam("assigned_to")))
+    if "created_after" in value_filters:
+        conditions.append(Task.created_at >= bindparam("created_after"))
+    if "created_before" in value_filters:
+        conditions.append(Task.created_at <= bindparam("created_before"))
+    if "due_after" in value_filters:
+        conditions.append(Task.due_date >= bindparam("due_after"))
+    if "due_before" in value_filters:
+        conditions.append(Task.due_date <= bindparam("due_before"))
+    if search is not None:
+        conditions.append(_task_text_condition(use_fts=search == "fts"))
+    if has_due_date is not None:
+        if has_due_date:
+            conditions.append(Task.due_date.is_not(None))
+        else:
+            conditions.append(Task.due_date.is_(None))
+    if is_overdue is not None:
+        # Evaluated by the database, so the planner can use the partial overdue
+        # index; local (naive) time matches how due dates are stored
+        now = func.localtimestamp()
+        if is_overdue:
+            conditions.append(
+                and_(
+                    Task.due_date.is_not(None),
+                    Task.due_date < now,
+                    Task.status != TaskStatus.completed
+                )
+            )
+        else:
+            conditions.append(
+                or_(
+                    Task.due_date.is_(None),
+                    Task.due_date >= now,
+                    Task.status == TaskStatus.completed
+                )
+            )
+    
+    if with_total:
+        query = select(Task, func.count().over().label("total"))
+    else:
+        query = select(Task)
+    # Listed tasks are serialized straight into responses; any relationship must
+    # be eager-loaded here, or it raises instead of lazy-loading once per row
+    query = query.options(raiseload("*"))
+    count_query = select(func.count(Task.id))
+    
+    if conditions:
+        query = query.where(and_(*conditions))
+        count_query = count_query.where(and_(*conditions))
+    
+    if keyset:
+        # Seek straight past the last task seen instead of counting off `skip` rows
+        cursor = tuple_(
+            bindparam("after_created_at", type_=Task.__table__.c.created_at.type),
+            bindparam("after_id", type_=Integer)
+        )
+        query = query.where(tuple_(Task.created_at, Task.id) < cursor)
+        query = query.order_by(Task.created_at.desc(), Task.id.desc())
+        if paginated:
+            query = query.limit(bindparam("limit", type_=Integer))
+        return query, count_query
+    
+    column = _SORTABLE.get(sort_by)
+    if column is not None:
+        # id breaks ties so pages never overlap or skip tasks with equal sort values
+        if descending:
+            query = query.order_by(column.desc(), Task.id.desc())
+        else:
+            query = query.order_by(column.asc(), Task.id.asc())
+    
+    if paginated:
+        query = query.offset(bindparam("skip", type_=Integer)).limit(bindparam("limit", type_=Integer))
+    
+    return query, count_query
+
+
+def build_task_queries(
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    assigned_to: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    search: Optional[str] = None,
+    has_due_date: Optional[bool] = None,
+    is_overdue: Optional[bool] = None,
+    sort_by: Optional[str] = None,
+    sort_order: str = "asc",
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    with_total: bool = False
+) -> TaskQueries:
+    """
+    Build the filtered task query and its matching count query.
+    
+    Both statements must be executed with the returned params.
+    `after` is a (created_at, id) keyset cursor: when given, the query returns
+    the tasks that follow it newest-first instead of using sort_by and skip.
+    With `with_total`, the query returns (task, total) rows where total is the
+    filtered count computed by a COUNT(*) OVER () window in the same scan.
+    """
+    params = {}
+    for name, value in (
+        ("status", status),
+        ("priority", priority),
+        ("assigned_to", f"%{assigned_to}%" if assigned_to else None),
+        ("created_after", created_after),
+        ("created_before", created_before),
+        ("due_after", due_after),
+        ("due_before", due_before),
+    ):
+        if value:
+            params[name] = value
+    value_filters = frozenset(params)
+    
+    search_mode = None
+    if search:
+        use_fts, search_params = _task_text_params(search)
+        search_mode = "fts" if use_fts else "like"
+        params.update(search_params)
+    
+    keyset = after is not None
+    if keyset:
+        params["after_created_at"], params["after_id"] = after
+        paginated = limit is not None
+    else:
+        paginated = skip is not None and limit is not None
+        if paginated:
+            params["skip"] = skip
+    if paginated:
+        params["limit"] = limit
+    
+    query, count_query = _task_query_template(
+        value_filters,
+        search_mode,
+        has_due_date,
+        is_overdue,
+        sort_by if sort_by in _SORTABLE else None,
+        sort_order.lower() == "desc",
+        paginated,
+        keyset,
+        with_total
+    )
+    return TaskQueries(query, count_query, params)
+
+
+# Builder design pattern on top of build_task_queries
 class TaskFilterBuilder:
     """Builder class for constructing complex task filters."""
     
     def __init__(self):
-        self.conditions = []
+        self.filters = {}
         self._session = None
-        self._base_query = select(Task)
         
     def session(self, session):
         """Set the database session."""
@@ -138,131 +487,111 @@ class TaskFilterBuilder:
     def by_status(self, status: Optional[TaskStatus]):
         """Filter by task status."""
         if status:
-            self.conditions.append(Task.status == status)
+            self.filters["status"] = status
         return self
     
     def by_priority(self, priority: Optional[TaskPriority]):
         """Filter by task priority."""
         if priority:
-            self.conditions.append(Task.priority == priority)
+            self.filters["priority"] = priority
         return self
     
     def by_assigned_to(self, assigned_to: Optional[str]):
         """Filter by assignee name (partial match)."""
         if assigned_to:
-            self.conditions.append(Task.assigned_to.ilike(f"%{assigned_to}%"))
+            self.filters["assigned_to"] = assigned_to
         return self
     
     def created_between(self, start_date: Optional[datetime], end_date: Optional[datetime]):
         """Filter by creation date range."""
         if start_date:
-            self.conditions.append(Task.created_at >= start_date)
+            self.filters["created_after"] = start_date
         if end_date:
-            self.conditions.append(Task.created_at <= end_date)
+            self.filters["created_before"] = end_date
         return self
     
     def due_between(self, start_date: Optional[datetime], end_date: Optional[datetime]):
         """Filter by due date range."""
         if start_date:
-            self.conditions.append(Task.due_date >= start_date)
+            self.filters["due_after"] = start_date
         if end_date:
-            self.conditions.append(Task.due_date <= end_date)
+            self.filters["due_before"] = end_date
         return self
     
     def search_text(self, search_term: Optional[str]):
         """Search in title and description."""
         if search_term:
-            search_pattern = f"%{search_term}%"
-            self.conditions.append(
-                or_(
-                    Task.title.ilike(search_pattern),
-                    Task.description.ilike(search_pattern)
-                )
-            )
+            self.filters["search"] = search_term
         return self
     
     def has_due_date(self, has_due: Optional[bool]):
         """Filter tasks that have or don't have due dates."""
         if has_due is not None:
-            if has_due:
-                self.conditions.append(Task.due_date.is_not(None))
-            else:
-                self.conditions.append(Task.due_date.is_(None))
+            self.filters["has_due_date"] = has_due
         return self
     
     def is_overdue(self, overdue: Optional[bool]):
         """Filter overdue tasks."""
         if overdue is not None:
-            now = datetime.now()
-            if overdue:
-                self.conditions.append(
-                    and_(
-                        Task.due_date.is_not(None),
-                        Task.due_date < now,
-                        Task.status != TaskStatus.completed
-                    )
-                )
-            else:
-                self.conditions.append(
-                    or_(
-                        Task.due_date.is_(None),
-                        Task.due_date >= now,
-                        Task.status == TaskStatus.completed
-                    )
-                )
+            self.filters["is_overdue"] = overdue
         return self
     
     def with_pagination(self, skip: int = 0, limit: int = 100):
         """Add pagination to the query."""
-        self._skip = skip
-        self._limit = limit
+        self.filters["skip"] = skip
+        self.filters["limit"] = limit
+        return self
+    
+    def after(self, cursor: Optional[Tuple[datetime, int]]):
+        """Continue after a (created_at, id) keyset cursor."""
+        if cursor is not None:
+            self.filters["after"] = cursor
         return self
     
     def order_by(self, field: str, direction: str = "asc"):
         """Add ordering to the query."""
-        if hasattr(Task, field):
-            column = getattr(Task, field)
-            if direction.lower() == "desc":
-                self._base_query = self._base_query.order_by(column.desc())
-            else:
-                self._base_query = self._base_query.order_by(column.asc())
+        self.filters["sort_by"] = field
+        self.filters["sort_order"] = direction
         return self
     
     def build_query(self):
         """Build the final query with all conditions."""
-        query = self._base_query
-        
-        if self.conditions:
-            query = query.where(and_(*self.conditions))
-        
-        return query
+        query, _, params = build_task_queries(**self.filters)
+        return query.params(params)
     
     def build_count_query(self):
         """Build a count query with the same conditions."""
-        query = select(func.count(Task.id))
-        
-        if self.conditions:
-            query = query.where(and_(*self.conditions))
-        
-        return query
+        _, count_query, params = build_task_queries(**self.filters)
+        return count_query.params(params)
     
-    def execute(self):
-        """Execute the query and return results with pagination."""
+    def execute(self, count: bool = True):
+        """
+        Execute the query and return results with pagination.
+        With count=False the total is not computed and None is returned instead.
+        """
         if not self._session:
             raise ValueError("Session must be set before executing query")
         
-        # Get total count
-        count_query = self.build_count_query()
-        total = self._session.exec(count_query).one()
+        if not count:
+            return self.execute_simple(), None
         
-        # Get paginated results
-        query = self.build_query()
+        if self.filters.get("after") is not None:
+            # The cursor condition would narrow a window count
+            query, count_query, params = build_task_queries(**self.filters)
+            total = self._session.exec(count_query, params=params).one()
+            return self._session.exec(query, params=params).all(), total
         
-        # Apply pagination
-        if hasattr(self, '_skip') and hasattr(self, '_limit'):
-            query = query.offset(self._skip).limit(self._limit)
+        # Get paginated results with the total alongside each row
+        query, count_query, params = build_task_queries(**self.filters, with_total=True)
+        rows = self._session.exec(query, params=params).all()
         
-        results = self._session.exec(query).all()
+        if rows:
+            results = [task for task, _ in rows]
+            total = rows[0].total
+        else:
+            # A page past the end has no rows to carry the total
+            results = []
+            total = self._session.exec(count_query, params=params).one()
         
         return results, total
     
@@ -271,13 +600,8 @@ class TaskFilterBuilder:
         if not self._session:
             raise ValueError("Session must be set before executing query")
         
-        query = self.build_query()
-        
-        # Apply pagination
-        if hasattr(self, '_skip') and hasattr(self, '_limit'):
-            query = query.offset(self._skip).limit(self._limit)
-        
-        return self._session.exec(query).all()
+        query, _, params = build_task_queries(**self.filters)
+        return self._session.exec(query, params=params).all()
 
 
 def create_task_filter():
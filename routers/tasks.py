@@ -1,13 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+import base64
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Response, status, Query
+from pydantic import TypeAdapter
 from sqlmodel import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from database import get_session
 from models import (
     Task, TaskCreate, TaskUpdate, TaskResponse, TaskStatus, TaskPriority,
-    BulkUpdateRequest, BulkDeleteRequest, BulkOperationResponse, TaskListResponse
+    BulkCreateRequest, BulkUpdateRequest, BulkDeleteRequest, BulkOperationResponse, TaskListResponse,
+    SortField, SortOrder
 )
+import cache
 import crud
 
 # Create router for task-related endpoints
@@ -17,25 +22,55 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Query parameters of the task list that make up its cache key and filters_applied
+_FILTER_KEYS = (
+    "status", "priority", "assigned_to", "created_after", "created_before",
+    "due_after", "due_before", "search", "has_due_date", "is_overdue",
+    "sort_by", "sort_order"
+)
+
+# Validator/serializer for a page of tasks, built once at import
+_TASK_LIST_ADAPTER = TypeAdapter(List[TaskResponse])
+
+# Most tasks returned by the status and priority endpoints, newest first
+# (keep their docstrings and the README in step)
+_BY_FIELD_LIMIT = 100
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a task list cursor can't be decoded"""
+
+
+def _encode_cursor(task: Task) -> str:
+    """Encode the (created_at, id) position of a task as an opaque cursor"""
+    position = f"{task.created_at.isoformat()}|{task.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor back into a (created_at, id) position"""
+    try:
+        created_at, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(task_id)
+    except ValueError:
+        raise InvalidCursorError("Invalid cursor")
+
 
 # Task CRUD endpoints
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(task: TaskCreate, session: Session = Depends(get_session)):
+def create_task(task: TaskCreate, session: Session = Depends(get_session)):
     """Create a new task"""
-    try:
-        db_task = crud.create_task(session=session, task=task)
-        return db_task
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error creating task: {str(e)}")
+    db_task = crud.create_task(session=session, task=task)
+    cache.invalidate_tasks()
+    return db_task
 
 
 @router.get("", response_model=TaskListResponse)
-async def get_tasks(
+def get_tasks(
     # Pagination
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Continue after the next_cursor of a previous page"),
     # Basic filters
     status: Optional[TaskStatus] = Query(None, description="Filter by task status"),
     priority: Optional[TaskPriority] = Query(None, description="Filter by task priority"),
@@ -50,8 +85,8 @@ async def get_tasks(
     has_due_date: Optional[bool] = Query(None, description="Filter tasks with/without due dates"),
     is_overdue: Optional[bool] = Query(None, description="Filter overdue tasks"),
     # Sorting
-    sort_by: Optional[str] = Query("created_at", description="Field to sort by"),
-    sort_order: Optional[str] = Query("desc", description="Sort order: asc or desc"),
+    sort_by: SortField = Query("created_at", description="Field to sort by"),
+    sort_order: SortOrder = Query("desc", description="Sort order: asc or desc"),
     session: Session = Depends(get_session)
 ):
     """
@@ -63,77 +98,102 @@ async def get_tasks(
     - **Search**: Text search in title and description
     - **Special Filters**: has_due_date, is_overdue
     - **Sorting**: Sort by any field with asc/desc order
-    - **Pagination**: Page-based pagination with metadata
+    - **Pagination**: Page-based pagination with metadata, or cursor-based
+      paging newest-first for deep scans (pass back `next_cursor`)
     
     ## Examples:
     - Get high priority pending tasks: `?status=pending&priority=high`
     - Get overdue tasks: `?is_overdue=true&sort_by=due_date&sort_order=asc`
     - Search recent tasks: `?search=urgent&created_after=2024-01-01`
     - Get tasks assigned to user: `?assigned_to=john&page=1&page_size=20`
+    - Get the page after a previous one: `?cursor=<next_cursor>`
     """
-    try:
-        # Calculate skip offset
-        skip = (page - 1) * page_size
-        
-        # Use the advanced filtering function from crud
-        tasks, total = crud.get_tasks(
-            session=session,
-            skip=skip,
-            limit=page_size,
-            status=status,
-            priority=priority,
-            assigned_to=assigned_to,
-            created_after=created_after,
-            created_before=created_before,
-            due_after=due_after,
-            due_before=due_before,
-            search=search,
-            has_due_date=has_due_date,
-            is_overdue=is_overdue,
-            sort_by=sort_by,
-            sort_order=sort_order
-        )
-        
-        # Calculate pagination metadata
-        total_pages = (total + page_size - 1) // page_size
+    after = None
+    if cursor:
+        # Cursors continue the newest-first order from where the previous page
+        # ended, so they can't be combined with another sort or a page number
+        if sort_by != "created_at" or sort_order != "desc" or page > 1:
+            raise InvalidCursorError("A cursor can't be combined with sort_by, sort_order or page")
+        after = _decode_cursor(cursor)
+    
+    # Listed explicitly, in _FILTER_KEYS order
+    filter_values = (
+        status, priority, assigned_to, created_after, created_before, due_after,
+        due_before, search, has_due_date, is_overdue, sort_by, sort_order
+    )
+    # Identical filter combinations are served from the cache until tasks change
+    cache_params = (page, page_size, cursor, *filter_values)
+    # Overdue pages depend on the current time, so they are never cached
+    cache_key = cache.current_task_list_key(cache_params) if is_overdue is None else None
+    cached = cache.get_task_list(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    # Calculate skip offset
+    skip = (page - 1) * page_size
+    
+    # Use the advanced filtering function from crud
+    tasks, total = crud.get_tasks(
+        session=session,
+        skip=skip,
+        limit=page_size,
+        after=after,
+        status=status,
+        priority=priority,
+        assigned_to=assigned_to,
+        created_after=created_after,
+        created_before=created_before,
+        due_after=due_after,
+        due_before=due_before,
+        search=search,
+        has_due_date=has_due_date,
+        is_overdue=is_overdue,
+        sort_by=sort_by,
+        sort_order=sort_order
+    )
+    
+    # Collect applied filters for response
+    filters_applied = {
+        key: value for key, value in zip(_FILTER_KEYS, filter_values) if value is not None
+    }
+    
+    # Calculate pagination metadata
+    total_pages = (total + page_size - 1) // page_size
+    if cursor:
+        # A cursor page only knows whether it was filled
+        has_next = len(tasks) == page_size
+        has_previous = True
+    else:
         has_next = page < total_pages
         has_previous = page > 1
-        
-        # Collect applied filters for response
-        filters_applied = {
-            k: v for k, v in {
-                "status": status,
-                "priority": priority,
-                "assigned_to": assigned_to,
-                "created_after": created_after,
-                "created_before": created_before,
-                "due_after": due_after,
-                "due_before": due_before,
-                "search": search,
-                "has_due_date": has_due_date,
-                "is_overdue": is_overdue,
-                "sort_by": sort_by,
-                "sort_order": sort_order
-            }.items() if v is not None
-        }
-        
-        return TaskListResponse(
-            tasks=tasks,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages,
-            has_next=has_next,
-            has_previous=has_previous,
-            filters_applied=filters_applied
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error retrieving tasks: {str(e)}")
+    
+    # Cursors follow the newest-first order, so they are only offered on it
+    next_cursor = None
+    if has_next and sort_by == "created_at" and sort_order == "desc":
+        next_cursor = _encode_cursor(tasks[-1])
+    
+    # Serialized once here and returned as-is, so FastAPI doesn't re-validate the
+    # page against TaskListResponse and the cache stores the exact same bytes;
+    # the rows still go through TaskResponse so only its fields are sent
+    body = orjson.dumps({
+        "tasks": _TASK_LIST_ADAPTER.dump_python(
+            _TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True), mode="json"
+        ),
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "has_next": has_next,
+        "has_previous": has_previous,
+        "filters_applied": filters_applied,
+        "next_cursor": next_cursor
+    })
+    cache.set_task_list(cache_key, body)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: int, session: Session = Depends(get_session)):
+def get_task(task_id: int, session: Session = Depends(get_session)):
     """Retrieve a specific task"""
     db_task = crud.get_task(session=session, task_id=task_id)
     if db_task is None:
@@ -142,95 +202,111 @@ async def get_task(task_id: int, session: Session = Depends(get_session)):
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-async def update_task(
+def update_task(
     task_id: int,
     task_update: TaskUpdate,
     session: Session = Depends(get_session)
 ):
     """Update an existing task"""
-    try:
-        db_task = crud.update_task(session=session, task_id=task_id, task_update=task_update)
-        if db_task is None:
-            raise HTTPException(status_code=404, detail="Task not found")
-        return db_task
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error updating task: {str(e)}")
+    db_task = crud.update_task(session=session, task_id=task_id, task_update=task_update)
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    cache.invalidate_tasks()
+    return db_task
 
 
 @router.delete("/{task_id}")
-async def delete_task(task_id: int, session: Session = Depends(get_session)):
+def delete_task(task_id: int, session: Session = Depends(get_session)):
     """Delete a task"""
     success = crud.delete_task(session=session, task_id=task_id)
     if not success:
         raise HTTPException(status_code=404, detail="Task not found")
+    cache.invalidate_tasks()
     return {"message": "Task deleted successfully"}
 
 
 # Filtering endpoints
 @router.get("/status/{status}", response_model=List[TaskResponse])
-async def get_tasks_by_status(status: TaskStatus, session: Session = Depends(get_session)):
-    """Get tasks by status"""
-    try:
-        tasks = crud.get_tasks_by_status(session=session, status=status)
-        return tasks
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error retrieving tasks: {str(e)}")
+def get_tasks_by_status(status: TaskStatus, session: Session = Depends(get_session)):
+    """
+    Get the 100 newest tasks by status
+    
+    Longer lists are truncated without notice; page through
+    `GET /tasks?status=...` to get all of them.
+    """
+    tasks, _ = crud.get_tasks(
+        session=session, status=status, limit=_BY_FIELD_LIMIT, with_total=False
+    )
+    return tasks
 
 
 @router.get("/priority/{priority}", response_model=List[TaskResponse])
-async def get_tasks_by_priority(priority: TaskPriority, session: Session = Depends(get_session)):
-    """Get tasks by priority"""
-    try:
-        tasks = crud.get_tasks_by_priority(session=session, priority=priority)
-        return tasks
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error retrieving tasks: {str(e)}")
+def get_tasks_by_priority(priority: TaskPriority, session: Session = Depends(get_session)):
+    """
+    Get the 100 newest tasks by priority
+    
+    Longer lists are truncated without notice; page through
+    `GET /tasks?priority=...` to get all of them.
+    """
+    tasks, _ = crud.get_tasks(
+        session=session, priority=priority, limit=_BY_FIELD_LIMIT, with_total=False
+    )
+    return tasks
 
 
 # Bulk operations
+@router.post("/bulk/create", response_model=BulkOperationResponse, status_code=status.HTTP_201_CREATED)
+def bulk_create_tasks(
+    bulk_request: BulkCreateRequest,
+    session: Session = Depends(get_session)
+):
+    """Bulk create multiple tasks"""
+    created_tasks = crud.bulk_create_tasks(
+        session=session,
+        tasks=bulk_request.tasks
+    )
+    cache.invalidate_tasks()
+    return BulkOperationResponse(
+        success=True,
+        message=f"Successfully created {len(created_tasks)} tasks",
+        affected_count=len(created_tasks),
+        tasks=created_tasks
+    )
+
+
 @router.post("/bulk/update", response_model=BulkOperationResponse)
-async def bulk_update_tasks(
+def bulk_update_tasks(
     bulk_request: BulkUpdateRequest,
     session: Session = Depends(get_session)
 ):
     """Bulk update multiple tasks"""
-    try:
-        updated_tasks = crud.bulk_update_tasks(
-            session=session,
-            task_ids=bulk_request.task_ids,
-            task_update=bulk_request.update_data
-        )
-        return BulkOperationResponse(
-            success=True,
-            message=f"Successfully updated {len(updated_tasks)} tasks",
-            affected_count=len(updated_tasks),
-            tasks=updated_tasks
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error bulk updating tasks: {str(e)}")
+    updated_tasks = crud.bulk_update_tasks(
+        session=session,
+        task_ids=bulk_request.task_ids,
+        task_update=bulk_request.update_data
+    )
+    cache.invalidate_tasks()
+    return BulkOperationResponse(
+        success=True,
+        message=f"Successfully updated {len(updated_tasks)} tasks",
+        affected_count=len(updated_tasks),
+        tasks=updated_tasks
+    )
 
 
 @router.post("/bulk/delete", response_model=BulkOperationResponse)
-async def bulk_delete_tasks(
+def bulk_delete_tasks(
     bulk_request: BulkDeleteRequest,
     session: Session = Depends(get_session)
 ):
     """Bulk delete multiple tasks"""
-    try:
-        deleted_count = crud.bulk_delete_tasks(
-            session=session,
-            task_ids=bulk_request.task_ids
-        )
-        return BulkOperationResponse(
-            success=True,
-            message=f"Successfully deleted {deleted_count} tasks",
-            affected_count=deleted_count
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error bulk deleting tasks: {str(e)}")
+    deleted_count = crud.bulk_delete_tasks(
+        session=session,
+        task_ids=bulk_request.task_ids
+    )
+    cache.invalidate_tasks()
+    return BulkOperationResponse(
+        success=True,
+        message=f"Successfully deleted {deleted_count} tasks",
+        affected_count=deleted_count
+    )
@@ -0,0 +1,11 @@
+"""
+Shared helpers for the test suite.
+"""
+
+import orjson
+
+
+def expect(response, status=200):
+    """Assert a response's status code and return its parsed body."""
+    assert response.status_code == status, response.text
+    return orjson.loads(response.content)
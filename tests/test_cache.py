@@ -0,0 +1,59 @@
+"""
+Unit tests for the task list cache.
+"""
+
+import pytest
+from models import TaskStatus
+import cache
+from cache import task_list_key, get_task_list
+
+
+class _DictRedis:
+    """The few Redis commands the cache uses, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+@pytest.mark.unit
+class TestTaskListCache:
+    """Test class for task list cache keys."""
+
+    def test_key_follows_parameters(self):
+        """Test the same filters map to the same key and different ones don't."""
+        first = task_list_key(0, (1, 10, TaskStatus.pending, None))
+        second = task_list_key(0, (1, 10, TaskStatus.pending, None))
+        assert first == second
+        assert first != task_list_key(0, (1, 10, TaskStatus.completed, None))
+        assert first != task_list_key(0, (1, 10, None, TaskStatus.pending))
+
+    def test_key_changes_with_generation(self):
+        """Test bumping the generation invalidates existing keys."""
+        params = (1, 10, TaskStatus.pending)
+        assert task_list_key(0, params) != task_list_key(1, params)
+
+    def test_disabled_without_redis(self):
+        """Test every lookup misses when no Redis URL is configured."""
+        assert cache.current_task_list_key((1, 10)) is None
+        assert get_task_list(None) is None
+
+    def test_page_stored_under_lookup_generation(self, monkeypatch):
+        """Test a page looked up before a write is not stored as current after it."""
+        monkeypatch.setattr(cache, "redis_client", _DictRedis())
+        params = (1, 10, TaskStatus.pending)
+        
+        key = cache.current_task_list_key(params)
+        cache.invalidate_tasks()  # a write commits while the page is being built
+        cache.set_task_list(key, b"stale")
+        
+        assert get_task_list(cache.current_task_list_key(params)) is None
@@ -3,11 +3,16 @@ Unit tests for CRUD operations.
 """
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlmodel import Session
-from models import Task, TaskCreate, TaskUpdate, TaskStatus, TaskPriority
+from models import (
+    Task, TaskCreate, TaskUpdate, TaskStatus, TaskPriority, create_task_filter,
+    build_task_queries
+)
 from crud import (
     create_task, get_task, get_tasks, update_task, delete_task, 
-    bulk_update_tasks, bulk_delete_tasks, search_tasks
+    bulk_update_tasks, bulk_delete_tasks, search_tasks, get_tasks_count,
+    bulk_create_tasks, TasksNotFoundError
 )
 
 class TestCrudOperations:
@@ -53,9 +58,7 @@ class TestCrudOperations:
         assert total == 0
         
         # Create multiple tasks
-        for i in range(5):
-            task_data = TaskCreate(title=f"Task {i+1}")
-            create_task(test_session, task_data)
+        bulk_create_tasks(test_session, [TaskCreate(title=f"Task {i+1}") for i in range(5)])
         
         # Get all tasks
         tasks, total = get_tasks(test_session)
@@ -70,6 +73,28 @@ class TestCrudOperations:
         assert page1_total == 5  # Total should be same
         assert page2_total == 5
         assert page1_tasks[0].id != page2_tasks[0].id  # Different tasks
+        
+        # Callers that don't need the total skip counting it
+        tasks, total = get_tasks(test_session, limit=2, with_total=False)
+        assert [task.title for task in tasks] == ["Task 5", "Task 4"]
+        assert total is None
+
+    def test_get_with_keyset_pagination(self, test_session: Session):
+        """Test paging through tasks with a (created_at, id) cursor."""
+        bulk_create_tasks(test_session, [TaskCreate(title=f"Task {i+1}") for i in range(5)])
+        
+        seen = []
+        after = None
+        while True:
+            page, total = get_tasks(test_session, limit=2, after=after)
+            assert total == 5  # Total ignores the cursor
+            if not page:
+                break
+            seen.extend(task.title for task in page)
+            after = (page[-1].created_at, page[-1].id)
+        
+        # Newest first, every task exactly once
+        assert seen == ["Task 5", "Task 4", "Task 3", "Task 2", "Task 1"]
 
     def test_update_task(self, test_session: Session):
         """Test updating tasks."""
@@ -103,6 +128,15 @@ class TestCrudOperations:
         # Delete non-existent task
         assert delete_task(test_session, 999) is False
 
+    def test_get_tasks_count(self, test_session: Session):
+        """Test counting tasks."""
+        assert get_tasks_count(test_session) == 0
+        
+        create_task(test_session, TaskCreate(title="Count Task 1"))
+        create_task(test_session, TaskCreate(title="Count Task 2"))
+        
+        assert get_tasks_count(test_session) == 2
+
     def test_filtering(self, test_session: Session):
         """Test filtering tasks by attributes."""
         # Create tasks with different attributes
@@ -111,10 +145,7 @@ class TestCrudOperations:
         task3 = TaskCreate(title="Completed Medium", status=TaskStatus.completed, priority=TaskPriority.medium, assigned_to="alice")
         task4 = TaskCreate(title="In Progress High", status=TaskStatus.in_progress, priority=TaskPriority.high, assigned_to="charlie")
         
-        create_task(test_session, task1)
-        create_task(test_session, task2)
-        create_task(test_session, task3)
-        create_task(test_session, task4)
+        bulk_create_tasks(test_session, [task1, task2, task3, task4])
         
         # Filter by status - get_tasks returns (tasks, total)
         completed_tasks, total = get_tasks(test_session, status=TaskStatus.completed)
@@ -134,6 +165,97 @@ class TestCrudOperations:
         assert len(completed_high) == 1
         assert completed_high[0].title == "Completed High"
 
+    def test_filter_statements_reused(self, test_session: Session):
+        """Test that filter values are bound, so the same filters reuse one statement."""
+        create_task(test_session, TaskCreate(title="Alice Task", assigned_to="alice"))
+        create_task(test_session, TaskCreate(title="Bob Task", assigned_to="bob"))
+        
+        alice = build_task_queries(assigned_to="alice", skip=0, limit=10)
+        bob = build_task_queries(assigned_to="bob", skip=0, limit=10)
+        assert alice.query is bob.query
+        assert alice.count_query is bob.count_query
+        assert build_task_queries(status=TaskStatus.pending).query is not alice.query
+        
+        bob_tasks, total = get_tasks(test_session, assigned_to="bob")
+        assert total == 1
+        assert bob_tasks[0].title == "Bob Task"
+
+    def test_search_grouped_outside_sqlite(self):
+        """Test the ILIKE search fallback keeps its OR inside the other filters."""
+        queries = build_task_queries(status=TaskStatus.completed, search="abc")
+        sql = str(queries.query.compile(dialect=postgresql.dialect()))
+        
+        assert "(task.title ILIKE %(search)s OR task.description ILIKE %(search)s)" in sql
+
+    def test_filter_builder(self, test_session: Session):
+        """Test the filter builder produces the same results as get_tasks."""
+        create_task(test_session, TaskCreate(title="Alice High", priority=TaskPriority.high, assigned_to="alice"))
+        create_task(test_session, TaskCreate(title="Alice Low", priority=TaskPriority.low, assigned_to="alice"))
+        create_task(test_session, TaskCreate(title="Bob High", priority=TaskPriority.high, assigned_to="bob"))
+        
+        tasks, total = (create_task_filter()
+                        .session(test_session)
+                        .by_priority(TaskPriority.high)
+                        .order_by("title", "asc")
+                        .with_pagination(0, 1)
+                        .execute())
+        assert total == 2
+        assert [task.title for task in tasks] == ["Alice High"]
+        
+        # Past the last page there are no rows but the total is still reported
+        tasks, total = (create_task_filter()
+                        .session(test_session)
+                        .by_priority(TaskPriority.high)
+                        .with_pagination(10, 1)
+                        .execute())
+        assert tasks == []
+        assert total == 2
+        
+        # Skipping the count
+        tasks, total = (create_task_filter()
+                        .session(test_session)
+                        .by_priority(TaskPriority.low)
+                        .execute(count=False))
+        assert [task.title for task in tasks] == ["Alice Low"]
+        assert total is None
+        
+        # A keyset cursor narrows the page but not the total
+        newest = get_tasks(test_session, priority=TaskPriority.high)[0][0]
+        tasks, total = (create_task_filter()
+                        .session(test_session)
+                        .by_priority(TaskPriority.high)
+                        .after((newest.created_at, newest.id))
+                        .execute())
+        assert len(tasks) == 1
+        assert total == 2
+        
+        tasks = (create_task_filter()
+                 .session(test_session)
+                 .by_assigned_to("alice")
+                 .execute_simple())
+        assert sorted(task.title for task in tasks) == ["Alice High", "Alice Low"]
+        
+        with pytest.raises(ValueError):
+            create_task_filter().execute()
+
+    def test_overdue_filter(self, test_session: Session):
+        """Test filtering overdue tasks against the database clock."""
+        from datetime import datetime, timedelta
+        
+        # Past due dates can't pass TaskCreate validation, so insert rows directly
+        yesterday = datetime.now() - timedelta(days=1)
+        test_session.add(Task(title="Late", due_date=yesterday))
+        test_session.add(Task(title="Late But Done", due_date=yesterday, status=TaskStatus.completed))
+        test_session.add(Task(title="Upcoming", due_date=datetime.now() + timedelta(days=1)))
+        test_session.add(Task(title="No Due Date"))
+        test_session.commit()
+        
+        overdue, total = get_tasks(test_session, is_overdue=True)
+        assert [task.title for task in overdue] == ["Late"]
+        
+        not_overdue, total = get_tasks(test_session, is_overdue=False, sort_by="title", sort_order="asc")
+        assert [task.title for task in not_overdue] == ["Late But Done", "No Due Date", "Upcoming"]
+
     def test_search(self, test_session: Session):
         """Test search functionality."""
         # Create tasks with searchable content
@@ -151,6 +273,35 @@ class TestCrudOperations:
         
         api_tasks, total = get_tasks(test_session, search="API")
         assert len(api_tasks) == 1  # Should find task 3
+        
+        # Substring matches are case-insensitive, like ILIKE
+        sql_tasks, total = get_tasks(test_session, search="gresql")
+        assert [task.title for task in sql_tasks] == ["Database Design"]
+        
+        # Terms too short for the full-text index still match
+        short_tasks, total = get_tasks(test_session, search="PI")
+        assert len(short_tasks) == 1
+
+    def test_search_index_follows_changes(self, test_session: Session):
+        """Test the search index stays in sync with updates and deletes."""
+        created_task = create_task(test_session, TaskCreate(title="Draft Report"))
+        
+        update_task(test_session, created_task.id, TaskUpdate(title="Final Report"))
+        assert list(search_tasks(test_session, "Draft")) == []
+        assert [task.id for task in search_tasks(test_session, "final")] == [created_task.id]
+        
+        delete_task(test_session, created_task.id)
+        assert list(search_tasks(test_session, "Final")) == []
+
+    def test_search_tasks(self, test_session: Session, monkeypatch):
+        """Test search_tasks streams every match across fetch batches."""
+        monkeypatch.setattr("crud._STREAM_BATCH", 2)
+        bulk_create_tasks(test_session, [TaskCreate(title=f"Task {i}") for i in range(5)])
+        create_task(test_session, TaskCreate(title="Later"))
+        
+        assert len(list(search_tasks(test_session, "Task"))) == 5
+        # search_tasks matches title or description, case-insensitively
+        assert [task.title for task in search_tasks(test_session, "LATER")] == ["Later"]
 
     def test_sorting(self, test_session: Session):
         """Test sorting functionality."""
@@ -178,15 +329,40 @@ class TestCrudOperations:
         assert tasks_title_desc[0].title == "Gamma Task"
         assert tasks_title_desc[1].title == "Beta Task"
         assert tasks_title_desc[2].title == "Alpha Task"
+        
+        # Unknown or non-column sort fields are ignored rather than resolved on the model
+        tasks_unsorted, total = get_tasks(test_session, sort_by="metadata", sort_order="asc")
+        assert len(tasks_unsorted) == 3
+
+    def test_bulk_create(self, test_session: Session):
+        """Test bulk create operations."""
+        tasks_data = [
+            TaskCreate(title=f"Bulk Create Task {i+1}", priority=TaskPriority.high)
+            for i in range(3)
+        ]
+        
+        created_tasks = bulk_create_tasks(test_session, tasks_data)
+        assert [task.title for task in created_tasks] == [
+            "Bulk Create Task 1", "Bulk Create Task 2", "Bulk Create Task 3"
+        ]
+        assert all(task.id is not None for task in created_tasks)
+        assert all(task.created_at is not None for task in created_tasks)
+        
+        # Verify tasks were persisted
+        for created_task in created_tasks:
+            task = get_task(test_session, created_task.id)
+            assert task.priority == TaskPriority.high
+        
+        assert bulk_create_tasks(test_session, []) == []
 
     def test_bulk_update(self, test_session: Session):
         """Test bulk update operations."""
         # Create multiple tasks
-        task_ids = []
-        for i in range(3):
-            task_data = TaskCreate(title=f"Bulk Update Task {i+1}", status=TaskStatus.pending)
-            created_task = create_task(test_session, task_data)
-            task_ids.append(created_task.id)
+        created_tasks = bulk_create_tasks(test_session, [
+            TaskCreate(title=f"Bulk Update Task {i+1}", status=TaskStatus.pending)
+            for i in range(3)
+        ])
+        task_ids = [task.id for task in created_tasks]
         
         # Bulk update
         update_data = TaskUpdate(status=TaskStatus.completed, priority=TaskPriority.high)
@@ -199,14 +375,25 @@ class TestCrudOperations:
             assert task.status == TaskStatus.completed
             assert task.priority == TaskPriority.high
 
+    def test_bulk_update_missing_tasks(self, test_session: Session):
+        """Test bulk update fails without changes when a task does not exist."""
+        created_task = create_task(test_session, TaskCreate(title="Existing Task"))
+        
+        update_data = TaskUpdate(status=TaskStatus.completed)
+        with pytest.raises(TasksNotFoundError, match="Tasks not found: \\[999\\]"):
+            bulk_update_tasks(test_session, [created_task.id, 999], update_data)
+        
+        # The existing task must be left untouched
+        task = get_task(test_session, created_task.id)
+        assert task.status == TaskStatus.pending
+
     def test_bulk_delete(self, test_session: Session):
         """Test bulk delete operations."""
         # Create multiple tasks
-        task_ids = []
-        for i in range(3):
-            task_data = TaskCreate(title=f"Bulk Delete Task {i+1}")
-            created_task = create_task(test_session, task_data)
-            task_ids.append(created_task.id)
+        created_tasks = bulk_create_tasks(test_session, [
+            TaskCreate(title=f"Bulk Delete Task {i+1}") for i in range(3)
+        ])
+        task_ids = [task.id for task in created_tasks]
         
         # Verify tasks exist
         for task_id in task_ids:
@@ -219,3 +406,41 @@ class TestCrudOperations:
         # Verify deletions
         for task_id in task_ids:
             assert get_task(test_session, task_id) is None
+
+    def test_bulk_delete_missing_tasks(self, test_session: Session):
+        """Test bulk delete fails without deleting when a task does not exist."""
+        created_task = create_task(test_session, TaskCreate(title="Existing Task"))
+        
+        with pytest.raises(TasksNotFoundError, match="Tasks not found: \\[999\\]"):
+            bulk_delete_tasks(test_session, [created_task.id, 999])
+        
+        # The existing task must not be deleted
+        assert get_task(test_session, created_task.id) is not None
+
+    def test_bulk_operations_duplicate_ids(self, test_session: Session):
+        """Test bulk operations treat repeated task IDs as a single task."""
+        created_task = create_task(test_session, TaskCreate(title="Duplicate Task"))
+        task_ids = [created_task.id, created_task.id]
+        
+        update_data = TaskUpdate(status=TaskStatus.completed)
+        updated_tasks = bulk_update_tasks(test_session, task_ids, update_data)
+        assert len(updated_tasks) == 1
+        
+        assert bulk_delete_tasks(test_session, task_ids) == 1
+
+    def test_bulk_operations_in_chunks(self, test_session: Session, monkeypatch):
+        """Test bulk operations split large ID lists across several statements."""
+        monkeypatch.setattr("crud._BULK_CHUNK", 2)
+        created_tasks = bulk_create_tasks(test_session, [
+            TaskCreate(title=f"Chunked Task {i+1}") for i in range(5)
+        ])
+        task_ids = [task.id for task in created_tasks]
+        
+        update_data = TaskUpdate(status=TaskStatus.completed)
+        updated_tasks = bulk_update_tasks(test_session, task_ids, update_data)
+        assert sorted(task.id for task in updated_tasks) == sorted(task_ids)
+        
+        with pytest.raises(TasksNotFoundError, match="Tasks not found: \\[999\\]"):
+            bulk_delete_tasks(test_session, task_ids + [999])
+        
+        assert bulk_delete_tasks(test_session, task_ids) == 5
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Unit tests for database configuration.
+"""
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.pool import StaticPool
+from crud import create_task, search_tasks
+from database import engine, get_session
+from models import TaskCreate
+
+
+@pytest.mark.unit
+class TestDatabaseEngine:
+    """Test class for the application database engine."""
+
+    def test_sqlite_pragmas_applied(self):
+        """Test SQLite connections are tuned when they are opened."""
+        with engine.connect() as connection:
+            # temp_store=MEMORY is reported as 2, cache_size keeps its sign
+            assert connection.execute(text("PRAGMA temp_store")).scalar() == 2
+            assert connection.execute(text("PRAGMA cache_size")).scalar() == -65536
+
+    def test_task_indexes_created(self, test_engine):
+        """Test the filter/sort indexes exist on the task table."""
+        index_names = {index["name"] for index in inspect(test_engine).get_indexes("task")}
+        
+        assert {
+            "ix_task_status_created_at",
+            "ix_task_priority_created_at",
+            "ix_task_assigned_to",
+            "ix_task_due_date",
+            "ix_task_created_at",
+            "ix_task_status_priority",
+        } <= index_names
+        # The partial overdue and trigram search indexes are only created on Postgres
+        assert "ix_task_overdue" not in index_names
+        assert "ix_task_search_trgm" not in index_names
+
+    def test_search_index_dropped_with_tables(self):
+        """Test recreating the tables doesn't leave old search entries behind."""
+        scratch_engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        SQLModel.metadata.create_all(scratch_engine)
+        with Session(scratch_engine) as session:
+            create_task(session, TaskCreate(title="Old task"))
+        
+        SQLModel.metadata.drop_all(scratch_engine)
+        SQLModel.metadata.create_all(scratch_engine)
+        with Session(scratch_engine) as session:
+            # Reuses the dropped task's id
+            create_task(session, TaskCreate(title="New task"))
+            assert list(search_tasks(session, "Old")) == []
+            assert [task.title for task in search_tasks(session, "New")] == ["New task"]
+        scratch_engine.dispose()
+
+    def test_session_keeps_objects_after_commit(self):
+        """Test request sessions don't expire loaded objects on commit."""
+        session = next(get_session())
+        try:
+            assert session.expire_on_commit is False
+        finally:
+            session.close()
+
+    def test_session_rolled_back_on_error(self):
+        """Test a failing request doesn't leave its transaction open."""
+        sessions = get_session()
+        session = next(sessions)
+        session.connection()
+        assert session.in_transaction()
+        
+        with pytest.raises(RuntimeError):
+            sessions.throw(RuntimeError("request failed"))
+        assert not session.in_transaction()
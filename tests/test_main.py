@@ -4,18 +4,22 @@ Unit tests for the main FastAPI application endpoints.
 
 import pytest
 from fastapi.testclient import TestClient
+from httpx import AsyncClient
+from crud import TasksNotFoundError
+from main import app
+from routers.tasks import InvalidCursorError
+from tests.helpers import expect
 
 
 @pytest.mark.unit
 class TestMainEndpoints:
     """Test class for main application endpoints."""
 
-    def test_root_endpoint(self, client: TestClient):
+    async def test_root_endpoint(self, client: AsyncClient):
         """Test the root endpoint returns API information."""
-        response = client.get("/")
+        response = await client.get("/")
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         
         # As per task.md: GET / - Return API information and available endpoints
         # Check that we get some API information
@@ -24,31 +28,46 @@ class TestMainEndpoints:
         # Should contain some form of endpoint information
         # (Implementation can vary - dynamic or static)
         assert len(data) > 0
+        assert "GET /tasks/{task_id}" in data["endpoints"]["routers"]["tasks"]
 
-    def test_health_check_endpoint(self, client: TestClient):
+    async def test_health_check_endpoint(self, client: AsyncClient):
         """Test the health check endpoint."""
-        response = client.get("/health")
+        response = await client.get("/health")
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         
         # As per task.md: GET /health - Return API health status
         assert "status" in data
         assert data["status"] == "healthy"
 
-    def test_openapi_docs_accessible(self, client: TestClient):
+    async def test_openapi_docs_accessible(self, client: AsyncClient):
         """Test that OpenAPI documentation is accessible."""
         # From task.md testing section: http://localhost:8000/docs
-        response = client.get("/docs")
+        response = await client.get("/docs")
         assert response.status_code == 200
 
-    def test_openapi_json_accessible(self, client: TestClient):
+    async def test_openapi_json_accessible(self, client: AsyncClient):
         """Test that OpenAPI JSON schema is accessible."""
         # From task.md testing section: http://localhost:8000/openapi.json
-        response = client.get("/openapi.json")
-        assert response.status_code == 200
-        
-        data = response.json()
+        response = await client.get("/openapi.json")
+        data = expect(response)
         assert "openapi" in data
         assert "info" in data
         assert "paths" in data
+        assert "/tasks/{task_id}" in data["paths"]
+
+    def test_openapi_json_lists_root_path(self, monkeypatch):
+        """Test the schema lists the proxy prefix as a server, even without the lifespan."""
+        monkeypatch.setattr(app, "servers", [])
+        monkeypatch.setattr(app, "openapi_schema", None)
+        monkeypatch.setattr(app.state, "openapi_bytes", None, raising=False)
+        
+        # Not entered as a context manager, so the lifespan doesn't run
+        response = TestClient(app, root_path="/api").get("/openapi.json")
+        assert expect(response)["servers"] == [{"url": "/api"}]
+
+    def test_only_expected_errors_reported_as_422(self):
+        """Test only the app's own input errors are mapped to 422, not every ValueError."""
+        assert TasksNotFoundError in app.exception_handlers
+        assert InvalidCursorError in app.exception_handlers
+        assert ValueError not in app.exception_handlers
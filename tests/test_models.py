@@ -105,3 +105,10 @@ class TestTaskModel:
         assert task.created_at is not None
         assert task.updated_at is None  # Default for new tasks
         assert isinstance(task.created_at, datetime)
+
+    def test_task_model_assignment_not_revalidated(self):
+        """Test the table model trusts assigned values instead of re-validating."""
+        task = Task(title="Test Task")
+        
+        task.title = "  Padded  "
+        assert task.title == "  Padded  "  # validate_title would have stripped it
@@ -2,179 +2,232 @@
 Unit tests for Task API endpoints.
 """
 
+import inspect
 import pytest
-from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from models import Task, TaskListResponse, TaskResponse
+from routers import tasks as tasks_router
+from tests.helpers import expect
+
+# One character over the title's 200 character limit
+_TOO_LONG_TITLE = "x" * 201
 
 
 @pytest.mark.unit
 class TestTaskEndpoints:
     """Test class for Task API endpoints"""
 
-    def test_create_task_valid_data(self, client: TestClient, sample_task_data):
+    async def test_create_task_valid_data(self, client: AsyncClient, sample_task_data):
         """Test creating a task with valid data."""
-        response = client.post("/tasks", json=sample_task_data)
+        response = await client.post("/tasks", json=dict(sample_task_data))
         
-        assert response.status_code == 201
-        data = response.json()
+        data = expect(response, 201)
         
-        assert "id" in data
-        assert data["title"] == sample_task_data["title"]
-        assert data["description"] == sample_task_data["description"]
-        assert data["status"] == sample_task_data["status"]
-        assert "created_at" in data
+        task_id, title, description, status, created_at = (
+            data["id"], data["title"], data["description"], data["status"], data["created_at"]
+        )
+        assert task_id is not None
+        assert title == sample_task_data["title"]
+        assert description == sample_task_data["description"]
+        assert status == sample_task_data["status"]
+        assert created_at is not None
 
-    def test_create_task_minimal_data(self, client: TestClient):
+    async def test_create_task_minimal_data(self, client: AsyncClient):
         """Test creating a task with minimal required data."""
         task_data = {"title": "Minimal Task"}
-        response = client.post("/tasks", json=task_data)
+        response = await client.post("/tasks", json=task_data)
         
-        assert response.status_code == 201
-        data = response.json()
+        data = expect(response, 201)
         
         assert data["title"] == "Minimal Task"
         assert data["description"] is None
         assert data["status"] == "pending"
 
-    def test_create_task_validation_errors(self, client: TestClient):
+    @pytest.mark.parametrize("payload,expected_status", [
+        ({"title": ""}, 422),  # Empty title
+        ({"title": _TOO_LONG_TITLE}, 422),  # Too long title
+    ])
+    async def test_create_task_validation_errors(self, client: AsyncClient, payload, expected_status):
         """Test task creation validation errors."""
-        # Empty title
-        response = client.post("/tasks", json={"title": ""})
-        assert response.status_code == 422
-        
-        # Too long title
-        response = client.post("/tasks", json={"title": "x" * 201})
-        assert response.status_code == 422
+        response = await client.post("/tasks", json=payload)
+        assert response.status_code == expected_status
 
-    def test_get_task_existing(self, client: TestClient, created_task):
+    async def test_get_task_existing(self, client: AsyncClient, created_task):
         """Test retrieving an existing task."""
         task_id = created_task["id"]
-        response = client.get(f"/tasks/{task_id}")
+        response = await client.get(f"/tasks/{task_id}")
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         
         assert data["id"] == task_id
         assert data["title"] == created_task["title"]
 
-    def test_get_task_nonexistent(self, client: TestClient):
+    async def test_get_task_past_due_date(self, client: AsyncClient, test_session):
+        """Test a stored task is returned after its due date has passed."""
+        task = Task(title="Overdue Task", due_date=datetime.now() - timedelta(days=1))
+        test_session.add(task)
+        test_session.commit()
+        
+        response = await client.get(f"/tasks/{task.id}")
+        assert expect(response)["title"] == "Overdue Task"
+
+    async def test_get_task_nonexistent(self, client: AsyncClient):
         """Test retrieving a non-existent task."""
-        response = client.get("/tasks/999")
+        response = await client.get("/tasks/999")
         assert response.status_code == 404
 
-    def test_get_tasks_empty(self, client: TestClient):
+    async def test_get_tasks_empty(self, client: AsyncClient):
         """Test getting tasks when database is empty."""
-        response = client.get("/tasks")
+        response = await client.get("/tasks")
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         
         assert data["tasks"] == []
         assert data["total"] == 0
 
-    def test_get_tasks_with_data(self, client: TestClient, created_multiple_tasks):
+    async def test_get_tasks_with_data(self, client: AsyncClient, created_multiple_tasks):
         """Test getting tasks when data exists."""
-        response = client.get("/tasks")
+        response = await client.get("/tasks")
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         
         assert len(data["tasks"]) == 3
         assert data["total"] == 3
 
-    def test_get_tasks_pagination(self, client: TestClient, created_multiple_tasks):
+    async def test_get_tasks_pagination(self, client: AsyncClient, created_multiple_tasks):
         """Test task list pagination."""
-        response = client.get("/tasks?page=1&page_size=2")
+        response = await client.get("/tasks?page=1&page_size=2")
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         
         assert len(data["tasks"]) == 2
         assert data["total"] == 3
         assert data["has_next"] is True
         assert data["has_previous"] is False
 
-    def test_get_tasks_filtering(self, client: TestClient):
-        """Test filtering tasks."""
-        # Create tasks with different statuses
-        client.post("/tasks", json={"title": "Completed Task", "status": "completed"})
-        client.post("/tasks", json={"title": "Pending Task", "status": "pending"})
+    async def test_get_tasks_cursor_pagination(self, client: AsyncClient):
+        """Test paging through tasks with next_cursor."""
+        for i in range(5):
+            await client.post("/tasks", json={"title": f"Task {i+1}"})
         
-        # Filter by status
-        response = client.get("/tasks?status=completed")
-        data = response.json()
+        titles = []
+        response = await client.get("/tasks?page_size=2")
+        while True:
+            data = expect(response)
+            assert data["total"] == 5
+            titles.extend(task["title"] for task in data["tasks"])
+            if data["next_cursor"] is None:
+                break
+            response = await client.get(f"/tasks?page_size=2&cursor={data['next_cursor']}")
         
-        assert len(data["tasks"]) == 1
-        assert data["tasks"][0]["status"] == "completed"
+        assert titles == ["Task 5", "Task 4", "Task 3", "Task 2", "Task 1"]
+        assert (await client.get("/tasks?cursor=not-a-cursor")).status_code == 422
 
-    def test_get_tasks_search(self, client: TestClient):
-        """Test searching tasks."""
-        # Create tasks with searchable content
-        client.post("/tasks", json={"title": "Python Programming"})
-        client.post("/tasks", json={"title": "Java Development"})
+    @pytest.mark.parametrize("query", ["sort_by=title", "sort_order=asc", "page=2"])
+    async def test_get_tasks_cursor_with_other_paging(self, client: AsyncClient, created_multiple_tasks, query):
+        """Test a cursor is rejected together with another sort or a page number."""
+        data = expect(await client.get("/tasks?page_size=2"))
         
-        response = client.get("/tasks?search=Python")
-        data = response.json()
+        response = await client.get(f"/tasks?page_size=2&cursor={data['next_cursor']}&{query}")
+        assert expect(response, 422)["detail"] == "A cursor can't be combined with sort_by, sort_order or page"
+
+    @pytest.mark.parametrize("url,field,expected", [
+        ("/tasks?status=completed", "status", "completed"),
+        ("/tasks?search=Python", "title", "Python Programming"),
+        ("/tasks/status/completed", "status", "completed"),
+        ("/tasks/priority/high", "priority", "high"),
+    ])
+    async def test_get_tasks_filtered(self, client: AsyncClient, seeded_tasks, url, field, expected):
+        """Test filtering, search and the status/priority endpoints."""
+        response = await client.get(url)
+        data = expect(response)
+        # The list endpoint wraps its page; status/priority return a plain list
+        tasks = data["tasks"] if isinstance(data, dict) else data
+        assert len(tasks) == 1
+        assert tasks[0][field] == expected
+
+    async def test_get_tasks_filters_applied(self, client: AsyncClient, seeded_tasks):
+        """Test the list response reports its filters and matches the response model."""
+        response = await client.get("/tasks?status=completed&created_after=2024-01-01T00:00:00")
+        data = expect(response)
         
-        assert len(data["tasks"]) == 1
-        assert "Python" in data["tasks"][0]["title"]
+        # The pre-serialized page still matches the documented response model
+        TaskListResponse.model_validate(data)
+        assert set(data["tasks"][0]) == set(TaskResponse.model_fields)
+        assert data["filters_applied"]["status"] == "completed"
+        assert data["filters_applied"]["created_after"] == "2024-01-01T00:00:00"
 
-    def test_update_task_existing(self, client: TestClient, created_task):
+    def test_filter_keys_match_list_parameters(self):
+        """Test _FILTER_KEYS names the list endpoint's filter parameters, in order."""
+        parameters = inspect.signature(tasks_router.get_tasks).parameters
+        filter_names = [
+            name for name in parameters if name not in ("page", "page_size", "cursor", "session")
+        ]
+        assert tasks_router._FILTER_KEYS == tuple(filter_names)
+
+    async def test_get_tasks_sorting(self, client: AsyncClient):
+        """Test sorting tasks and rejecting unknown sort fields."""
+        await client.post("/tasks", json={"title": "Beta"})
+        await client.post("/tasks", json={"title": "Alpha"})
+        
+        response = await client.get("/tasks?sort_by=title&sort_order=asc")
+        assert [task["title"] for task in expect(response)["tasks"]] == ["Alpha", "Beta"]
+        
+        assert (await client.get("/tasks?sort_by=metadata")).status_code == 422
+        assert (await client.get("/tasks?sort_order=sideways")).status_code == 422
+
+    async def test_update_task_existing(self, client: AsyncClient, created_task):
         """Test updating an existing task."""
         task_id = created_task["id"]
         update_data = {"title": "Updated Task", "status": "completed"}
         
-        response = client.put(f"/tasks/{task_id}", json=update_data)
+        response = await client.put(f"/tasks/{task_id}", json=update_data)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         
         assert data["title"] == "Updated Task"
         assert data["status"] == "completed"
 
-    def test_update_task_nonexistent(self, client: TestClient):
+    async def test_update_task_nonexistent(self, client: AsyncClient):
         """Test updating a non-existent task."""
-        response = client.put("/tasks/999", json={"title": "Updated"})
-        assert response.status_code in [400, 404]
+        response = await client.put("/tasks/999", json={"title": "Updated"})
+        assert response.status_code == 404
 
-    def test_delete_task_existing(self, client: TestClient, created_task):
+    async def test_delete_task_existing(self, client: AsyncClient, created_task, test_session):
         """Test deleting an existing task."""
         task_id = created_task["id"]
-        response = client.delete(f"/tasks/{task_id}")
+        response = await client.delete(f"/tasks/{task_id}")
         
         assert response.status_code == 200
         
-        # Verify deletion
-        response = client.get(f"/tasks/{task_id}")
-        assert response.status_code == 404
+        # Verify deletion (the 404 response is covered by test_get_task_nonexistent)
+        assert test_session.get(Task, task_id) is None
 
-    def test_delete_task_nonexistent(self, client: TestClient):
+    async def test_delete_task_nonexistent(self, client: AsyncClient):
         """Test deleting a non-existent task."""
-        response = client.delete("/tasks/999")
+        response = await client.delete("/tasks/999")
         assert response.status_code == 404
 
-    def test_get_tasks_by_status(self, client: TestClient):
-        """Test getting tasks by status endpoint."""
-        # Create a completed task
-        client.post("/tasks", json={"title": "Done Task", "status": "completed"})
-        
-        response = client.get("/tasks/status/completed")
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert all(task["status"] == "completed" for task in data)
-
-    def test_get_tasks_by_priority(self, client: TestClient):
-        """Test getting tasks by priority endpoint."""
-        # Create a high priority task
-        client.post("/tasks", json={"title": "Urgent Task", "priority": "high"})
+    async def test_bulk_create_tasks(self, client: AsyncClient):
+        """Test bulk creating tasks."""
+        bulk_data = {
+            "tasks": [
+                {"title": "Bulk Task 1", "priority": "high"},
+                {"title": "Bulk Task 2"}
+            ]
+        }
+        response = await client.post("/tasks/bulk/create", json=bulk_data)
         
-        response = client.get("/tasks/priority/high")
-        assert response.status_code == 200
+        data = expect(response, 201)
+        assert data["success"] is True
+        assert data["affected_count"] == 2
+        assert [task["title"] for task in data["tasks"]] == ["Bulk Task 1", "Bulk Task 2"]
         
-        data = response.json()
-        assert all(task["priority"] == "high" for task in data)
+        response = await client.get("/tasks")
+        assert expect(response)["total"] == 2
 
-    def test_bulk_update_tasks(self, client: TestClient, created_multiple_tasks):
+    async def test_bulk_update_tasks(self, client: AsyncClient, created_multiple_tasks):
         """Test bulk updating tasks."""
         task_ids = [task["id"] for task in created_multiple_tasks]
         
@@ -182,21 +235,27 @@ class TestTaskEndpoints:
             "task_ids": task_ids,
             "update_data": {"status": "completed"}
         }
-        response = client.post("/tasks/bulk/update", json=bulk_data)
+        response = await client.post("/tasks/bulk/update", json=bulk_data)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         assert data["success"] is True
         assert data["affected_count"] == 3
 
-    def test_bulk_delete_tasks(self, client: TestClient, created_multiple_tasks):
+    async def test_bulk_delete_tasks(self, client: AsyncClient, created_multiple_tasks):
         """Test bulk deleting tasks."""
         task_ids = [task["id"] for task in created_multiple_tasks]
         
         bulk_data = {"task_ids": task_ids}
-        response = client.post("/tasks/bulk/delete", json=bulk_data)
+        response = await client.post("/tasks/bulk/delete", json=bulk_data)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = expect(response)
         assert data["success"] is True
-        assert data["affected_count"] == 3
\ No newline at end of file
+        assert data["affected_count"] == 3
+
+    async def test_bulk_delete_missing_tasks(self, client: AsyncClient, created_task, test_session):
+        """Test bulk deleting unknown tasks is rejected without deleting any."""
+        bulk_data = {"task_ids": [created_task["id"], 999]}
+        response = await client.post("/tasks/bulk/delete", json=bulk_data)
+        
+        assert expect(response, 422)["detail"] == "Tasks not found: [999]"
+        assert test_session.get(Task, created_task["id"]) is not None